@@ -12,6 +12,8 @@ import itertools
 import os
 import re
 
+import numpy as np
+
 
 class MetaDomain(type):
     """Metaclass for behind the scenes processes for domains."""
@@ -84,9 +86,49 @@ class Domain(object, metaclass=MetaDomain):
         """Generate a hyperparameter value from this domain."""
         raise NotImplementedError
 
+    def generate_batch(self, n):
+        """Generate multiple hyperparameter values from this domain.
+
+        Subclasses should override this to draw all ``n`` values in a single
+        call to their underlying sampler where possible.
+
+        Parameters
+        ----------
+        n : int
+            The number of values to generate.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            Array of ``n`` values drawn from this domain.
+        """
+        return np.asarray([self.generate() for _ in range(n)])
+
     def map_to_domain(self, value, bound=True):
         return value
 
+    def map_to_domain_batch(self, values, count=-1):
+        """Map multiple values into this domain at once.
+
+        Subclasses with a vectorized mapping should override this to avoid
+        the per-value Python call.
+
+        Parameters
+        ----------
+        values : iterable
+            The values to map into this domain.
+        count : int, optional
+            The number of values, when known ahead of time; lets the
+            output buffer be allocated up front.
+
+        Returns
+        -------
+        mapped : numpy.ndarray
+            Array of mapped values as float32.
+        """
+        return np.fromiter((self.map_to_domain(v) for v in values),
+                           dtype=np.float32, count=count)
+
     def to_index(self, value):
         """Convert a value to its index in the domain."""
         return value
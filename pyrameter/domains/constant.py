@@ -6,6 +6,8 @@ ConstantDomain
     A singleton hyperparameter domain.
 """
 
+import numpy as np
+
 from pyrameter.domains.base import Domain
 
 
@@ -39,6 +41,10 @@ class ConstantDomain(Domain):
         """Generate a hyperparameter value from this domain."""
         return self.domain
 
+    def generate_batch(self, n):
+        """Generate multiple hyperparameter values from this domain."""
+        return np.full(n, self.domain)
+
     def map_to_domain(self, idx):
         return self.domain
 
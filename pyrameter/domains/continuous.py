@@ -100,6 +100,16 @@ class ContinuousDomain(Domain):
         return self.callback(
             self.domain.rvs(*self.domain_args, **self.domain_kwargs))
 
+    def generate_batch(self, n):
+        """Generate multiple hyperparameter values from this domain.
+
+        All ``n`` values are drawn from the underlying distribution in a
+        single vectorized call.
+        """
+        values = self.domain.rvs(*self.domain_args, size=n,
+                                 **self.domain_kwargs)
+        return np.asarray([self.callback(v) for v in values])
+
     def map_to_domain(self, value, bound=False):
         if bound:
             try:
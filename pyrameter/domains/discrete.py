@@ -92,6 +92,18 @@ class DiscreteDomain(Domain):
         else:
             return None
 
+    def generate_batch(self, n):
+        """Generate multiple hyperparameter values from this domain.
+
+        All ``n`` indices are drawn in a single vectorized call and used to
+        index into the domain values.
+        """
+        if len(self.domain) == 0:
+            return np.full(n, None)
+        idx = scipy.stats.randint.rvs(0, len(self.domain), size=n,
+                                      random_state=self.random_state)
+        return np.asarray(self.domain)[[self.callback(i) for i in idx]]
+
     def map_to_domain(self, idx, bound=True):
         if bound:
             idx = int(round(idx))
@@ -0,0 +1,53 @@
+"""Specialized covariance kernel implementations.
+
+Functions
+---------
+matern32
+    Matern nu=1.5 kernel over squared euclidean distances.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from pyrameter.kernels._matern32 import matern32 as _matern32_native
+except ImportError:
+    _matern32_native = None
+
+# A Python float, not np.sqrt: a NumPy float64 scalar would promote
+# float32 distance matrices to float64 in the fallback path.
+SQRT3 = math.sqrt(3.0)
+
+
+def _matern32_numpy(D2, length_scale):
+    r = np.sqrt(np.maximum(D2, 0)) * (SQRT3 / length_scale)
+    return (1.0 + r) * np.exp(-r)
+
+
+def matern32(D2, length_scale):
+    """Evaluate the Matern nu=1.5 kernel over squared distances.
+
+    Distances depend only on the data, so a cached squared-distance matrix
+    lets kernel evaluations at new length scales reduce to the elementwise
+    transform ``(1 + sqrt(3) r) exp(-sqrt(3) r)``. When the compiled
+    extension is available, 2-D contiguous inputs are transformed in
+    parallel at C level; other inputs fall back to the NumPy
+    implementation.
+
+    Parameters
+    ----------
+    D2 : numpy.ndarray
+        Squared euclidean distances between pairs of points.
+    length_scale : float
+        The kernel length scale.
+
+    Returns
+    -------
+    K : numpy.ndarray
+        Kernel values of the same shape as ``D2``.
+    """
+    if _matern32_native is not None and isinstance(D2, np.ndarray) \
+            and D2.ndim == 2 and D2.flags.c_contiguous:
+        return _matern32_native(D2, float(length_scale))
+    return _matern32_numpy(D2, length_scale)
@@ -1,5 +1,6 @@
 from .bayes import bayes_opt as bayes
+from .bayes import bayes_opt_q as bayes_q
 from .random import random_search as random
 from .tpe import tpe
 
-__all__ = ['bayes', 'random', 'tpe']
+__all__ = ['bayes', 'bayes_q', 'random', 'tpe']
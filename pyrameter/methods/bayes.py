@@ -4,23 +4,381 @@ Functions
 ---------
 bayes_opt
     Spearmint-style gaussian process-based Bayesian optimization.
+bayes_opt_q
+    Batch Bayesian optimization via sequential fantasy updates.
 """
 
+import math
+
 import numpy as np
-import scipy.stats
-from sklearn.gaussian_process import GaussianProcessRegressor
-from sklearn.gaussian_process.kernels import Matern
+import scipy.linalg
+import scipy.special
+from scipy.spatial.distance import cdist
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
+from pyrameter.kernels import matern32 as _matern32
 from pyrameter.methods.random import random_search
 from pyrameter.trial import Trial
 
+INV_SQRT2 = 1.0 / math.sqrt(2.0)
+LOG_SQRT2PI = 0.5 * math.log(2.0 * math.pi)
+
+
+def _log_expected_improvement(mu, sigma, best):
+    """Compute the log expected improvement of candidates.
+
+    Expected improvement is computed in log space,
+    ``log(sigma) + log(pdf(gamma) + gamma * cdf(gamma))``, which stays
+    stable where the linear-space terms underflow and needs no post-hoc
+    NaN masking; candidates with ``sigma == 0`` map to ``-inf`` in a
+    single branchless pass. The argmax is unchanged by the transform.
+
+    Parameters
+    ----------
+    mu : numpy.ndarray
+        Posterior mean at each candidate.
+    sigma : numpy.ndarray
+        Posterior standard deviation at each candidate.
+    best : float
+        The best (minimum) observed objective value.
+
+    Returns
+    -------
+    log_ei : numpy.ndarray
+        The log expected improvement of each candidate.
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        gamma = (mu - best) / sigma
+        log_pdf = -0.5 * gamma * gamma - LOG_SQRT2PI
+        log_cdf = scipy.special.log_ndtr(gamma)
+        # gamma * cdf changes sign at zero; combine with the pdf term by
+        # log-sum-exp on the positive side and log1p on the negative side.
+        # Rounding deep in the tail can push the log1p argument below -1,
+        # so clamp it to its analytic range.
+        pos = np.logaddexp(log_pdf,
+                           np.log(np.maximum(gamma, 0)) + log_cdf)
+        ratio = np.clip(gamma * np.exp(log_cdf - log_pdf), -1.0, 0.0)
+        neg = log_pdf + np.log1p(ratio)
+        log_ei = np.log(sigma) + np.where(gamma > 0, pos, neg)
+    log_ei = np.where(sigma == 0, -np.inf, log_ei)
+    # argmax treats NaN as the maximum; anything non-finite upward must
+    # never win the candidate selection.
+    return np.where(np.isnan(log_ei), -np.inf, log_ei)
+
+
+if njit is not None:
+    # Fuse the log-EI arithmetic into a single parallel loop, replacing
+    # the array temporaries and scipy dispatch with inline erf/exp.
+    @njit(parallel=True, fastmath=True)
+    def _log_expected_improvement(mu, sigma, best):  # noqa: F811
+        log_ei = np.empty_like(mu)
+        for i in prange(mu.shape[0]):
+            s = sigma[i]
+            if s == 0.0:
+                log_ei[i] = -np.inf
+                continue
+            gamma = (mu[i] - best) / s
+            log_pdf = -0.5 * gamma * gamma - LOG_SQRT2PI
+            if gamma > 0.0:
+                cdf = 0.5 * math.erfc(-gamma * INV_SQRT2)
+                a = log_pdf
+                b = math.log(gamma) + math.log(cdf)
+                m = a if a > b else b
+                log_ei[i] = math.log(s) + m + \
+                    math.log(math.exp(a - m) + math.exp(b - m))
+            elif gamma > -25.0:
+                # Same log-space treatment as the NumPy path: clamp the
+                # gamma * cdf / pdf ratio to its analytic range [-1, 0].
+                cdf = 0.5 * math.erfc(-gamma * INV_SQRT2)
+                ratio = gamma * cdf * math.exp(-log_pdf)
+                if ratio < -1.0:
+                    ratio = -1.0
+                if ratio > -1.0:
+                    log_ei[i] = math.log(s) + log_pdf + math.log1p(ratio)
+                else:
+                    log_ei[i] = -np.inf
+            else:
+                # Deeper in the tail erfc/exp underflow before the ratio
+                # does; use pdf + gamma * cdf ~ pdf / gamma^2.
+                log_ei[i] = math.log(s) + log_pdf - \
+                    2.0 * math.log(-gamma)
+        return log_ei
+
+
+def _cholesky_f32(K):
+    """Factor a float32 kernel matrix in single precision.
+
+    Calls the float32 LAPACK routine directly, halving the memory
+    bandwidth of the factorization relative to the float64 round trip
+    that the generic scipy wrappers would take.
+
+    Parameters
+    ----------
+    K : numpy.ndarray
+        Symmetric positive definite matrix of dtype float32.
+
+    Returns
+    -------
+    L : numpy.ndarray
+        The lower-triangular Cholesky factor.
+    """
+    L, info = scipy.linalg.lapack.spotrf(K, lower=1)
+    if info != 0:
+        raise scipy.linalg.LinAlgError(
+            'Kernel matrix is not positive definite (info=%d)' % info)
+    return L
+
+
+def _cho_solve_f32(L, y):
+    """Solve ``K x = y`` from a single-precision Cholesky factor.
+
+    Parameters
+    ----------
+    L : numpy.ndarray
+        Lower-triangular factor produced by ``_cholesky_f32``.
+    y : numpy.ndarray
+        Right-hand side of the system.
+
+    Returns
+    -------
+    x : numpy.ndarray
+        The solution vector.
+    """
+    x, info = scipy.linalg.lapack.spotrs(L, y, lower=1)
+    return x
+
+
+def _extend_cholesky(L, p, c):
+    """Extend a Cholesky factor by one row/column of the kernel matrix.
+
+    Given the factor ``L`` of an ``(n - 1, n - 1)`` kernel matrix, compute
+    the factor of the matrix bordered by column ``p`` and diagonal entry
+    ``c`` with a single triangular solve in O(n^2) rather than refactoring
+    in O(n^3).
+
+    Parameters
+    ----------
+    L : numpy.ndarray
+        Lower-triangular Cholesky factor of shape ``(n - 1, n - 1)``.
+    p : numpy.ndarray
+        Kernel values between the previous observations and the new one.
+    c : float
+        Kernel value of the new observation with itself, including noise.
+
+    Returns
+    -------
+    L : numpy.ndarray or None
+        The extended factor of shape ``(n, n)``, or ``None`` if the update
+        is not positive definite and a full refactor is required.
+    """
+    n = L.shape[0] + 1
+    q = scipy.linalg.solve_triangular(L, p.ravel(), lower=True)
+    d = c - q.dot(q)
+    if d <= 0:
+        return None
+    return np.block([
+        [L, np.zeros((n - 1, 1), dtype=L.dtype)],
+        [q[None, :], np.sqrt(d) * np.ones((1, 1), dtype=L.dtype)]
+    ])
+
+
+def _train_distances(cache, features):
+    """Get squared distances between training points, reusing cached rows.
+
+    Parameters
+    ----------
+    cache : dict or None
+        Fit state produced by ``_fit_gp``.
+    features : numpy.ndarray
+        Array of observed hyperparameter values of shape ``(n, d)``.
+
+    Returns
+    -------
+    D2 : numpy.ndarray
+        Squared euclidean distances of shape ``(n, n)``.
+    """
+    n = features.shape[0]
+    D2 = cache.get('D2') if cache is not None else None
+    if D2 is not None:
+        if D2.shape[0] == n:
+            return D2
+        if D2.shape[0] == n - 1:
+            row = cdist(features[-1:], features,
+                        'sqeuclidean').astype(np.float32)
+            return np.block([[D2, row[:, :-1].T], [row]])
+    return cdist(features, features, 'sqeuclidean').astype(np.float32)
+
+
+def _fit_gp(space, features, labels, length_scale, noise):
+    """Fit a gaussian process to observed trials, reusing cached factors.
+
+    The Cholesky factor of the kernel matrix, the weight vector
+    ``alpha = K^-1 y``, and the squared-distance matrix between training
+    points are cached on ``space`` keyed by the number of observed trials.
+    When no new trials have been recorded since the last fit, the O(n^3)
+    factorization is skipped entirely; when exactly one trial has been
+    added, the cached factor is extended in O(n^2). A full refactor only
+    happens on larger changes or when the length scale differs from the
+    cached fit, and even then the distance matrix is reused.
+
+    Parameters
+    ----------
+    space : pyrameter.searchspace.SearchSpace
+        The search space being fit.
+    features : numpy.ndarray
+        Array of observed hyperparameter values of shape ``(n, d)``.
+    labels : numpy.ndarray
+        Observed objective values of shape ``(n,)``.
+    length_scale : float
+        The Matern kernel length scale.
+    noise : float
+        Value added to the diagonal of the kernel matrix for conditioning.
+
+    Returns
+    -------
+    cache : dict
+        The fit state, with entries ``n``, ``L``, ``alpha``,
+        ``length_scale``, and ``D2``.
+    """
+    n = features.shape[0]
+    cache = space._gp_cache
+
+    # Distance matrices depend only on the data and survive length-scale
+    # changes; cached kernel values do not.
+    K_pool = None
+    D2_pool = None
+    if cache is not None:
+        D2_pool = cache.get('D2_pool')
+        if cache['length_scale'] == length_scale:
+            K_pool = cache.get('K_pool')
+            if cache['n'] == n:
+                return cache
+            if cache['n'] == n - 1:
+                row = cdist(features[-1:], features,
+                            'sqeuclidean').astype(np.float32)
+                D2 = np.block([[cache['D2'], row[:, :-1].T], [row]])
+                p = _matern32(row[0, :-1], length_scale)
+                L = _extend_cholesky(cache['L'], p, 1.0 + noise)
+                if L is not None:
+                    alpha = _cho_solve_f32(L, labels)
+                    cache = {'n': n, 'L': L, 'alpha': alpha,
+                             'length_scale': length_scale, 'D2': D2,
+                             'K_pool': K_pool, 'D2_pool': D2_pool}
+                    space._gp_cache = cache
+                    return cache
+
+    D2 = _train_distances(cache, features)
+    K = _matern32(D2, length_scale)
+    K[np.diag_indices_from(K)] += noise
+    L = _cholesky_f32(K)
+    alpha = _cho_solve_f32(L, labels)
+    cache = {'n': n, 'L': L, 'alpha': alpha, 'length_scale': length_scale,
+             'D2': D2, 'K_pool': K_pool, 'D2_pool': D2_pool}
+    space._gp_cache = cache
+
+    return cache
+
+
+def _cross_covariance(cache, features, pool, length_scale):
+    """Get the cross-covariance between training data and a candidate pool.
+
+    The squared distances and kernel values between the training data and
+    the pool are cached alongside the Cholesky factors; when new trials
+    have been recorded since they were computed, only the corresponding
+    rows are added.
+
+    Parameters
+    ----------
+    cache : dict
+        Fit state produced by ``_fit_gp``.
+    features : numpy.ndarray
+        The training data the gaussian process was fit to.
+    pool : numpy.ndarray
+        The persistent candidate pool of shape ``(m, d)``.
+    length_scale : float
+        The Matern kernel length scale.
+
+    Returns
+    -------
+    K_pool : numpy.ndarray
+        Cross-covariance matrix of shape ``(n, m)``.
+    """
+    n = features.shape[0]
+    D2_pool = cache.get('D2_pool')
+    if D2_pool is None or D2_pool.shape[1] != pool.shape[0] \
+            or D2_pool.shape[0] > n:
+        D2_pool = cdist(features, pool, 'sqeuclidean').astype(np.float32)
+    elif D2_pool.shape[0] < n:
+        rows = cdist(features[D2_pool.shape[0]:], pool,
+                     'sqeuclidean').astype(np.float32)
+        D2_pool = np.vstack((D2_pool, rows))
+    cache['D2_pool'] = D2_pool
+
+    K_pool = cache.get('K_pool')
+    if K_pool is None or K_pool.shape != D2_pool.shape:
+        K_pool = _matern32(D2_pool, length_scale)
+        cache['K_pool'] = K_pool
+    return K_pool
+
+
+def _predict_gp(cache, features, candidates, length_scale, K_star=None):
+    """Compute the gaussian process posterior at candidate points.
+
+    Parameters
+    ----------
+    cache : dict
+        Fit state produced by ``_fit_gp``.
+    features : numpy.ndarray
+        The training data the gaussian process was fit to.
+    candidates : numpy.ndarray
+        Points to predict at, of shape ``(m, d)``.
+    length_scale : float
+        The Matern kernel length scale.
+    K_star : numpy.ndarray, optional
+        Precomputed cross-covariance between ``features`` and
+        ``candidates``. Computed here when not provided.
+
+    Returns
+    -------
+    mu, sigma : numpy.ndarray
+        Posterior mean and standard deviation at each candidate.
+    """
+    if K_star is None:
+        K_star = _matern32(
+            cdist(features, candidates, 'sqeuclidean').astype(np.float32),
+            length_scale)
+    mu = K_star.T.dot(cache['alpha'])
+    v = scipy.linalg.solve_triangular(cache['L'], K_star, lower=True)
+    var = 1.0 - np.sum(v ** 2, axis=0)
+    sigma = np.sqrt(np.maximum(var, 0))
+    return mu, sigma
+
 
-def bayes_opt(space, n_samples=10, warm_up=10, **gp_kws):
+def bayes_opt(space, n_samples=10, warm_up=10, reuse_candidates=False,
+              length_scale=1.0, alpha=1e-4):
     """Spearmint-style gaussian process-based Bayesian optimization.
 
     Parameters
     ----------
     space : pyrameter.searchspace.SearchSpace
+    n_samples : int
+        The number of candidate hyperparameter sets to evaluate.
+    warm_up : int
+        The number of random search iterations to use to seed the gaussian
+        process.
+    reuse_candidates : bool
+        If ``True``, generate the candidate pool once and score the same
+        pool on every call, caching its cross-covariance with the training
+        data. Default: ``False``.
+    length_scale : float
+        Length scale of the Matern covariance kernel. Default: 1.0.
+    alpha : float
+        Value added to the diagonal of the kernel matrix for conditioning.
+        Default: 1e-4.
     """
     # Warm up with a number of random search results, and seed a with more
     # random searches at an interval throughout the search.
@@ -28,36 +386,117 @@ def bayes_opt(space, n_samples=10, warm_up=10, **gp_kws):
         params = random_search(space)
     else:
         # Put the space's evaluated hyperparameters and result into arrays.
-        features = space.to_array()
-        labels = np.array(space.objective)
-        labels.reshape((-1, 1))
-
-        # If no kernel is provided in the arguments, set the kernel to be a
-        # default Matern
-        if 'kernel' not in gp_kws:
-            gp_kws['kernel'] = Matern()
+        # Everything downstream stays in single precision.
+        features = space.to_array()[:, :-1]
+        labels = np.array(space.objective, dtype=np.float32)
 
-        # Set up and train the Gaussian process regressor
-        gp = GaussianProcessRegressor(**gp_kws)
-        gp.fit(features, labels)
+        # Fit the gaussian process, reusing the cached Cholesky factor and
+        # weights when the training data is unchanged since the last call.
+        cache = _fit_gp(space, features, labels, length_scale, alpha)
 
-        # Generate a number of candidate hyperparameter values.
-        potential_params = np.zeros((n_samples, len(space.domains)))
-        for i in range(n_samples):
-            potential_params[i] += space.generate()
+        # Generate a number of candidate hyperparameter values. With a
+        # persistent pool, reuse the same candidates and their cached
+        # cross-covariance with the training data across calls.
+        if reuse_candidates:
+            if space._candidate_pool is None \
+                    or space._candidate_pool.shape[0] != n_samples:
+                space._candidate_pool = space.generate_batch(n_samples)
+            potential_params = space._candidate_pool
+            K_star = _cross_covariance(cache, features, potential_params,
+                                       length_scale)
+        else:
+            potential_params = space.generate_batch(n_samples)
+            K_star = None
 
         # Compute the expected improvement of each candidate as a function of
         # the best-observed performance and the expectation and variance of the
         # predicted scores.
-        mu, sigma = gp.predict(potential_params, return_std=True)
+        mu, sigma = _predict_gp(cache, features, potential_params,
+                                length_scale, K_star=K_star)
         best = np.min(labels)
-        with np.errstate(divide='ignore'):
-            gamma = (mu - best) / sigma
-        ei = (mu - gamma) * scipy.stats.norm.cdf(gamma) + \
-             sigma * scipy.stats.norm.pdf(gamma)
-        ei[sigma == 0] = 0  # sigma == 0 leads to NaNs in ei; handle it here
+        log_ei = _log_expected_improvement(mu, sigma, best)
 
         # Return the candidate with the best expected improvement
-        params = potential_params[np.argmax(ei, axis=1)]
+        params = potential_params[int(np.argmax(log_ei))]
+
+    return params
+
+
+def bayes_opt_q(space, q=2, n_samples=10, warm_up=10, length_scale=1.0,
+                alpha=1e-4):
+    """Batch Bayesian optimization via sequential fantasy updates.
+
+    Select ``q`` candidates from a single gaussian process fit for parallel
+    evaluation. After each pick, the chosen candidate is folded back into
+    the gaussian process as a fantasy observation at its posterior mean by
+    extending the Cholesky factor in O(n^2), and the expected improvement
+    of the remaining candidates is recomputed against the updated
+    posterior.
+
+    Parameters
+    ----------
+    space : pyrameter.searchspace.SearchSpace
+    q : int
+        The number of candidates to return per fit. Default: 2.
+    n_samples : int
+        The number of candidate hyperparameter sets to evaluate.
+    warm_up : int
+        The number of random search iterations to use to seed the gaussian
+        process.
+    length_scale : float
+        Length scale of the Matern covariance kernel. Default: 1.0.
+    alpha : float
+        Value added to the diagonal of the kernel matrix for conditioning.
+        Default: 1e-4.
+
+    Returns
+    -------
+    params : numpy.ndarray
+        Array of ``q`` hyperparameter sets of shape
+        ``(q, len(space.domains))``.
+    """
+    if len(space.objective) < warm_up or len(space.objective) % warm_up == 0:
+        params = np.asarray([random_search(space) for _ in range(q)])
+    else:
+        features = space.to_array()[:, :-1]
+        labels = np.array(space.objective, dtype=np.float32)
+
+        cache = _fit_gp(space, features, labels, length_scale, alpha)
+
+        candidates = space.generate_batch(max(n_samples, q))
+        remaining = np.ones(candidates.shape[0], dtype=bool)
+
+        # Track the fantasy-augmented state locally so the cached fit on
+        # the space only ever reflects real observations.
+        X = features
+        y = labels
+        fantasy = {'L': cache['L'], 'alpha': cache['alpha']}
+        best = np.min(labels)
+
+        picks = []
+        for _ in range(q):
+            idx = np.where(remaining)[0]
+            mu, sigma = _predict_gp(fantasy, X, candidates[idx],
+                                    length_scale)
+            log_ei = _log_expected_improvement(mu, sigma, best)
+            j = int(np.argmax(log_ei))
+            pick = idx[j]
+            picks.append(candidates[pick])
+            remaining[pick] = False
+
+            # Fold the pick back in as a fantasy observation at its
+            # posterior mean.
+            x_star = candidates[pick:pick + 1]
+            p = _matern32(
+                cdist(X, x_star, 'sqeuclidean').ravel().astype(np.float32),
+                length_scale)
+            L = _extend_cholesky(fantasy['L'], p, 1.0 + alpha)
+            if L is not None:
+                X = np.vstack((X, x_star))
+                y = np.append(y, mu[j])
+                fantasy = {'L': L, 'alpha': _cho_solve_f32(L, y)}
+                best = min(best, mu[j])
+
+        params = np.asarray(picks)
 
     return params
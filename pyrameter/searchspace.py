@@ -7,21 +7,102 @@ SearchSpace
 """
 
 import collections
-import functools
 import itertools
-from multiprocessing.pool import ThreadPool
 import operator
-import warnings
 
 import numpy as np
-from sklearn.gaussian_process import GaussianProcessRegressor
-from sklearn.gaussian_process.kernels import RBF
+import scipy.linalg
+import scipy.optimize
+from joblib import Parallel, delayed
+from scipy.spatial.distance import cdist
 
 from pyrameter.domains.base import Domain
 from pyrameter.methods.random import random_search
 from pyrameter.trial import Trial
 
 
+def _fit_rbf_length_scale(D2, labels, initial, noise=1e-5):
+    """Maximize the gaussian process marginal likelihood over length scale.
+
+    With the squared-distance matrix fixed, each candidate length scale
+    costs one elementwise exponential and one Cholesky factorization
+    rather than a full kernel evaluation.
+
+    Parameters
+    ----------
+    D2 : numpy.ndarray
+        Squared euclidean distances between pairs of training points.
+    labels : numpy.ndarray
+        Observed objective values for the training points.
+    initial : float
+        Starting estimate of the length scale; the search is bracketed
+        around it.
+    noise : float
+        Value added to the kernel diagonal for conditioning.
+
+    Returns
+    -------
+    length_scale : float
+        The length scale maximizing the marginal likelihood.
+    """
+    # The optimizer revisits near-identical length scales as it converges,
+    # and each evaluation costs an elementwise exp plus a Cholesky factor.
+    # Memoize on the quantized scale so repeats cost a dict lookup; the
+    # distance matrix is fixed, so the scale alone is a sufficient key.
+    memo = {}
+
+    def neg_lml(log_ls):
+        ls = np.exp(log_ls)
+        key = round(float(ls), 3)
+        if key in memo:
+            return memo[key]
+        K = np.exp(-D2 / (2.0 * ls * ls))
+        K[np.diag_indices_from(K)] += noise
+        try:
+            L = scipy.linalg.cholesky(K, lower=True)
+        except scipy.linalg.LinAlgError:
+            memo[key] = np.inf
+            return np.inf
+        alpha = scipy.linalg.cho_solve((L, True), labels)
+        lml = 0.5 * labels.dot(alpha) + np.sum(np.log(np.diag(L)))
+        memo[key] = lml
+        return lml
+
+    res = scipy.optimize.minimize_scalar(
+        neg_lml,
+        bounds=(np.log(initial) - 3.0, np.log(initial) + 3.0),
+        method='bounded')
+    return float(np.exp(res.x))
+
+
+def _one_uncertainty_fit(D2, labels, split, seed):
+    """Fit one random split of the trial data for the uncertainty estimate.
+
+    Parameters
+    ----------
+    D2 : numpy.ndarray
+        Squared euclidean distances between all pairs of trials.
+    labels : numpy.ndarray
+        Observed objective values for all trials.
+    split : int
+        The number of trials to include in the random split.
+    seed : int
+        Seed for the per-fit random number generator, so parallel workers
+        do not contend over shared random state.
+
+    Returns
+    -------
+    scale : float
+        The optimized inverse length scale of the fit.
+    """
+    rng = np.random.default_rng(seed)
+    indices = rng.permutation(labels.shape[0])[:split]
+    est = rng.uniform(0.1, 2.0)
+    ls = _fit_rbf_length_scale(D2[np.ix_(indices, indices)],
+                               labels[indices], est)
+    return 1.0 / ls
+
+
 class SearchSpaceMeta(type):
     """Metaclass for handling behind-the-scenes tasks for SearchSpace objects.
     """
@@ -46,6 +127,8 @@ class SearchSpace(object, metaclass=SearchSpaceMeta):
 
         self._complexity = None
         self._uncertainty = None
+        self._gp_cache = None
+        self._candidate_pool = None
 
         self.domains = domains if domains is not None else []
         self.domains.sort()
@@ -90,10 +173,15 @@ class SearchSpace(object, metaclass=SearchSpaceMeta):
         space, normalized to a scale of [1, inf)
         """
         if self._complexity is None:
-            self._complexity = functools.reduce(
-                operator.mul,
-                map(lambda d: d.complexity, self.domains),
-                1.0)
+            if not self.domains:
+                self._complexity = 1.0
+            else:
+                # Accumulate in log space: one vectorized sum and exp, and
+                # no overflow from repeated Python-level multiplication.
+                logs = np.log(np.fromiter(
+                    (d.complexity for d in self.domains),
+                    dtype=np.float64, count=len(self.domains)))
+                self._complexity = float(np.exp(logs.sum()))
         return self._complexity
 
     @classmethod
@@ -135,6 +223,28 @@ class SearchSpace(object, metaclass=SearchSpaceMeta):
         """
         return [d.generate() for d in self.domains]
 
+    def generate_batch(self, n):
+        """Generate multiple sets of hyperparameters for this search space.
+
+        Values are drawn column-by-column, with each domain sampling all ``n``
+        of its values in a single vectorized call.
+
+        Parameters
+        ----------
+        n : int
+            The number of hyperparameter sets to generate.
+
+        Returns
+        -------
+        hyperparameters : numpy.ndarray
+            Array of shape ``(n, len(self.domains))`` with one set of
+            hyperparameters per row, in order of domain name.
+        """
+        out = np.empty((n, len(self.domains)), dtype=np.float32)
+        for j, domain in enumerate(self.domains):
+            out[:, j] = domain.generate_batch(n)
+        return out
+
     def optimum(self, mode='min'):
         """Get the trial with the optimal performance.
 
@@ -151,9 +261,10 @@ class SearchSpace(object, metaclass=SearchSpaceMeta):
             The trial with the optimal observed value of the objective
             function.
         """
-        return sorted([t for t in self.trials if t.objective is not None],
-                      key=lambda x: x.objective,
-                      reverse=(mode == 'max'))[0]
+        key = operator.attrgetter('objective')
+        completed = (t for t in self.trials if t.objective is not None)
+        return max(completed, key=key) if mode == 'max' \
+            else min(completed, key=key)
 
     def to_array(self):
         """Convert the trials in this search space into a contiguous array.
@@ -167,14 +278,16 @@ class SearchSpace(object, metaclass=SearchSpaceMeta):
             in the row. If no trials have been conducted, returns ``None``.
         """
         if len(self.trials) > 0:
-            out = np.zeros((len(self.trials), len(self.domains) + 1),
-                  dtype=np.float32)
-
-            for i, result in enumerate(self.trials):
-                vec = [self.domains[j].map_to_domain(result.hyperparameters[j])
-                       for j in range(len(self.domains))]
-                vec.append(result.objective)
-                out[i] += np.asarray(vec)
+            n_trials = len(self.trials)
+            out = np.empty((n_trials, len(self.domains) + 1),
+                           dtype=np.float32)
+
+            for j, domain in enumerate(self.domains):
+                out[:, j] = domain.map_to_domain_batch(
+                    (t.hyperparameters[j] for t in self.trials),
+                    count=n_trials)
+            out[:, -1] = np.fromiter((t.objective for t in self.trials),
+                                     dtype=np.float32, count=n_trials)
         else:
             out = None
         return out
@@ -188,13 +301,11 @@ class SearchSpace(object, metaclass=SearchSpaceMeta):
         }
 
         if not simplify:
-            with ThreadPool() as p:
-                domains = p.map(lambda x: x.to_json(), self.domains)
-                trials = p.map(lambda x: x.to_json(), self.trials)
+            domains = [d.to_json() for d in self.domains]
+            trials = [t.to_json() for t in self.trials]
         else:
-            with ThreadPool() as p:
-                domains = p.map(lambda x: x.id, self.domains)
-                trials = p.map(lambda x: x.id, self.trials)
+            domains = [d.id for d in self.domains]
+            trials = [t.id for t in self.trials]
 
         jsonified.update({'domains': domains, 'trials': trials})
         return jsonified
@@ -221,19 +332,18 @@ class SearchSpace(object, metaclass=SearchSpaceMeta):
             features = uncertainty_array[:, :-1]
             labels = uncertainty_array[:, -1]
 
-            split = int(np.floor(labels.shape * 0.8))
-
-            scales = np.zeros(50)
-            for i in range(50):
-                indices = np.random.permutation(np.arange(labels.shape[0]))
-                est = np.random.uniform(0.1, 2.0)
-                gp = GaussianProcessRegressor(kernel=RBF(length_scale=est),
-                                              alpha=1e-5)
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    gp.fit(features[indices[:split]],
-                           labels[indices[:split]])
-                scales[i] += np.power(gp.kernel.theta[0], -1.0)
+            split = int(np.floor(labels.shape[0] * 0.8))
+
+            # Pairwise distances are independent of the split permutation
+            # and the length scale; compute them once and subset per split.
+            D2 = cdist(features, features, 'sqeuclidean')
+
+            # The 50 fits are independent; distribute them across cores.
+            seeds = np.random.randint(0, 2 ** 31 - 1, size=50)
+            scales = np.asarray(
+                Parallel(n_jobs=-1)(
+                    delayed(_one_uncertainty_fit)(D2, labels, split, seed)
+                    for seed in seeds))
 
             self._uncertainty = np.linalg.norm(scales.max() - scales.min())
         else:
@@ -1,5 +1,26 @@
 #!/usr/bin/env python
-from setuptools import setup
+import os
+
+from setuptools import Extension, setup
+
+# The compiled Matern kernel is an optional speedup; the pure-NumPy
+# fallback in pyrameter.kernels is used when Cython is unavailable or
+# the .pyx source is not part of the distribution.
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+matern32_pyx = os.path.join('pyrameter', 'kernels', '_matern32.pyx')
+if cythonize is not None and os.path.exists(matern32_pyx):
+    ext_modules = cythonize([
+        Extension('pyrameter.kernels._matern32',
+                  [matern32_pyx],
+                  extra_compile_args=['-fopenmp'],
+                  extra_link_args=['-fopenmp']),
+    ])
+else:
+    ext_modules = []
 
 setup(
     name='pyrameter',
@@ -11,7 +32,9 @@ setup(
     packages=['pyrameter',
               'pyrameter.backend',
               'pyrameter.domains',
+              'pyrameter.kernels',
               'pyrameter.methods',],
+    ext_modules=ext_modules,
               # 'pyrameter.models',
               # 'pyrameter.db'],
     classifiers=[
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from pyrameter.domains.base import Domain
@@ -33,6 +34,12 @@ def test_generate():
         d.generate()
 
 
+def test_generate_batch():
+    d = Domain()
+    with pytest.raises(NotImplementedError):
+        d.generate_batch(10)
+
+
 def test_map_to_domain():
     inputs = [None, 'foo', 1, 1.0, True, False]
     d = Domain()
@@ -41,6 +48,18 @@ def test_map_to_domain():
         assert d.map_to_domain(i) == i
 
 
+def test_map_to_domain_batch():
+    inputs = [1, 1.0, 2, 3.5]
+    d = Domain()
+
+    mapped = d.map_to_domain_batch(inputs)
+    assert mapped.dtype == np.float32
+    assert np.all(mapped == np.asarray(inputs, dtype=np.float32))
+
+    mapped = d.map_to_domain_batch((i for i in inputs), count=len(inputs))
+    assert np.all(mapped == np.asarray(inputs, dtype=np.float32))
+
+
 def test_to_index():
     inputs = [None, 'foo', 1, 1.0, True, False]
     d = Domain()
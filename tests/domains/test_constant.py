@@ -37,6 +37,13 @@ def test_generate():
         assert d.generate() == domain
 
 
+def test_generate_batch():
+    d = ConstantDomain('foo', 42)
+    batch = d.generate_batch(10)
+    assert len(batch) == 10
+    assert all(b == 42 for b in batch)
+
+
 def test_map_to_domain():
     inputs = [None, 'foo', 1, 1.0, True, False]
     d = ConstantDomain('foo', 1.0)
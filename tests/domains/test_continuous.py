@@ -49,6 +49,21 @@ def test_generate():
         assert d.generate() == correct
 
 
+def test_generate_batch():
+    d = ContinuousDomain('foo', 'uniform', loc=0, scale=1, seed=42)
+    rs = np.random.RandomState(42)
+    correct = scipy.stats.uniform.rvs(loc=0, scale=1, size=100,
+                                      random_state=rs)
+    assert np.all(d.generate_batch(100) == correct)
+
+    d = ContinuousDomain('foo', 'norm', loc=-873, scale=98, seed=42,
+                         callback=lambda x: x * 2)
+    rs = np.random.RandomState(42)
+    correct = scipy.stats.norm.rvs(loc=-873, scale=98, size=100,
+                                   random_state=rs)
+    assert np.all(d.generate_batch(100) == correct * 2)
+
+
 def test_map_to_domain():
     d = ContinuousDomain('foo', 'uniform', loc=0, scale=1, seed=42)
     assert d.map_to_domain(-1) == -1
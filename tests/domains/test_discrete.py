@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+import scipy.stats
 
 from pyrameter.domains.discrete import DiscreteDomain
 
@@ -59,6 +60,20 @@ def test_generate():
         domain.append(i)
 
 
+def test_generate_batch():
+    domain = list(range(35, 135))
+    d = DiscreteDomain('foo', domain, seed=42)
+    rs = np.random.RandomState(42)
+    idx = scipy.stats.randint.rvs(0, len(domain), size=100, random_state=rs)
+    correct = np.asarray(domain)[idx]
+    assert np.all(d.generate_batch(100) == correct)
+
+    d = DiscreteDomain('foo', [])
+    batch = d.generate_batch(10)
+    assert len(batch) == 10
+    assert all(b is None for b in batch)
+
+
 def test_map_to_domain():
     domain = range(35, 135)
     d = DiscreteDomain('foo', domain)
@@ -72,6 +87,16 @@ def test_map_to_domain():
     assert d.map_to_domain(-1, bound=False) is None
 
 
+def test_map_to_domain_batch():
+    domain = range(35, 135)
+    d = DiscreteDomain('foo', domain)
+
+    indices = list(range(len(domain)))
+    mapped = d.map_to_domain_batch(indices, count=len(indices))
+    correct = [d.map_to_domain(idx) for idx in indices]
+    assert np.all(mapped == np.asarray(correct, dtype=np.float32))
+
+
 def test_to_index():
     domain = range(35, 135)
     d = DiscreteDomain('foo', domain)
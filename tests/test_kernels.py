@@ -0,0 +1,25 @@
+import numpy as np
+from scipy.spatial.distance import cdist
+from sklearn.gaussian_process.kernels import Matern
+
+from pyrameter.kernels import matern32
+
+
+def test_matern32():
+    rs = np.random.RandomState(42)
+    X = rs.uniform(size=(20, 3))
+    Y = rs.uniform(size=(15, 3))
+
+    for length_scale in (0.1, 1.0, 2.5):
+        correct = Matern(length_scale=length_scale, nu=1.5)(X, Y)
+        D2 = cdist(X, Y, 'sqeuclidean')
+        assert np.allclose(matern32(D2, length_scale), correct)
+
+
+def test_matern32_dtype():
+    rs = np.random.RandomState(42)
+    X = rs.uniform(size=(10, 2))
+    D2 = cdist(X, X, 'sqeuclidean').astype(np.float32)
+
+    assert matern32(D2, 1.0).dtype == np.float32
+    assert matern32(D2.astype(np.float64), 1.0).dtype == np.float64
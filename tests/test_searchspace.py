@@ -0,0 +1,22 @@
+import numpy as np
+import scipy.stats
+
+from pyrameter.domains.constant import ConstantDomain
+from pyrameter.domains.continuous import ContinuousDomain
+from pyrameter.searchspace import SearchSpace
+
+
+def test_generate_batch():
+    domains = [ContinuousDomain('a', 'uniform', loc=0, scale=1, seed=42),
+               ConstantDomain('b', 7)]
+    space = SearchSpace(domains)
+
+    batch = space.generate_batch(10)
+    assert batch.shape == (10, 2)
+    assert batch.dtype == np.float32
+
+    rs = np.random.RandomState(42)
+    correct = scipy.stats.uniform.rvs(loc=0, scale=1, size=10,
+                                      random_state=rs)
+    assert np.allclose(batch[:, 0], correct)
+    assert np.all(batch[:, 1] == 7)